@@ -1,35 +1,189 @@
+import asyncio
+import codecs
+import functools
 import json
 import logging
 import os
-import pprint
 import sys
+import threading
 import time
 import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from io import BytesIO
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import EventStreamError
 
 sys.path.append('../')
 from util.tagging import standard_tags, standard_tags_kv
 
 region_name = os.environ.get("AWS_REGION", "us-east-1")
-iam_client = boto3.client('iam')
-sts_client = boto3.client('sts')
-
-account_id = sts_client.get_caller_identity()["Account"]
-dynamodb_client = boto3.client('dynamodb')
-dynamodb_resource = boto3.resource('dynamodb')
-lambda_client = boto3.client('lambda')
-bedrock_agent_client = boto3.client('bedrock-agent')
-bedrock_agent_runtime_client = boto3.client('bedrock-agent-runtime')
+
+# Shared client configuration: keep connections alive and pooled so repeated calls
+# reuse the same TCP/TLS session instead of paying a new handshake each time
+boto_config = Config(
+    tcp_keepalive=True,
+    max_pool_connections=50,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+    connect_timeout=3,
+    read_timeout=60
+)
+
+_session = boto3.session.Session()
+_session_lock = threading.Lock()
+
+# Module level clients are created on first use, see __getattr__ below
+_LAZY_CLIENTS = {
+    'iam_client': 'iam',
+    'sts_client': 'sts',
+    'dynamodb_client': 'dynamodb',
+    'lambda_client': 'lambda',
+    'bedrock_agent_client': 'bedrock-agent',
+    'bedrock_agent_runtime_client': 'bedrock-agent-runtime',
+}
+_LAZY_RESOURCES = {
+    'dynamodb_resource': 'dynamodb',
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _client(service_name):
+    # creating clients from a shared session is not thread-safe
+    with _session_lock:
+        return _session.client(service_name, config=boto_config)
+
+
+@functools.lru_cache(maxsize=None)
+def _resource(service_name):
+    with _session_lock:
+        return _session.resource(service_name, config=boto_config)
+
+
+@functools.lru_cache(maxsize=1)
+def _account_id():
+    return _client('sts').get_caller_identity()["Account"]
+
+
+@functools.lru_cache(maxsize=1)
+def _policy_arn_prefix():
+    return f'arn:aws:iam::{_account_id()}:policy/'
+
+
+def _policy_arn(policy_name):
+    # customer managed policy ARN, the account specific prefix is only built once
+    return _policy_arn_prefix() + policy_name
+
+
+def __getattr__(name):
+    # PEP 562: keep iam_client, account_id etc. importable without creating them at import time
+    if name in _LAZY_CLIENTS:
+        return _client(_LAZY_CLIENTS[name])
+    if name in _LAZY_RESOURCES:
+        return _resource(_LAZY_RESOURCES[name])
+    if name == 'account_id':
+        return _account_id()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 logging.basicConfig(format='[%(asctime)s] p%(process)s {%(filename)s:%(lineno)d} %(levelname)s - %(message)s', level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+try:
+    import orjson
+
+    def dumps_policy(document):
+        return orjson.dumps(document).decode()
+except ImportError:
+    def dumps_policy(document):
+        return json.dumps(document)
+
+
+def _assume_role_policy_json(service):
+    return dumps_policy({
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {
+                    "Service": service
+                },
+                "Action": "sts:AssumeRole"
+            }
+        ]
+    })
+
+
+# Policy documents that never change are serialized once at import time
+_LAMBDA_ASSUME_POLICY_JSON = _assume_role_policy_json("lambda.amazonaws.com")
+_BEDROCK_ASSUME_POLICY_JSON = _assume_role_policy_json("bedrock.amazonaws.com")
+
+# Small in-process cache for IAM lookups so re-running the setup cells does not repeat the
+# get_role / get_policy fallbacks for roles and policies that already exist. Entries are only
+# dropped when the role or policy is deleted, attaching policies does not change these responses
+IAM_CACHE_TTL = 60
+IAM_CACHE_MAXSIZE = 1024
+_iam_cache = {}
+
+
+def _cached_iam_call(operation, **kwargs):
+    key = (operation, tuple(sorted(kwargs.items())))
+    entry = _iam_cache.get(key)
+    if entry and time.monotonic() - entry[0] < IAM_CACHE_TTL:
+        return entry[1]
+
+    response = getattr(_client('iam'), operation)(**kwargs)
+    _iam_cache[key] = (time.monotonic(), response)
+    if len(_iam_cache) > IAM_CACHE_MAXSIZE:
+        # dicts keep insertion order, so the first key is the oldest entry
+        del _iam_cache[next(iter(_iam_cache))]
+    return response
+
+
+def _invalidate_iam_cache(*names):
+    # drop every cached lookup made for one of the given role names / policy ARNs
+    for key in list(_iam_cache):
+        if any(value in names for _, value in key[1]):
+            _iam_cache.pop(key, None)
+
+
+def get_role_cached(role_name):
+    return _cached_iam_call('get_role', RoleName=role_name)
+
+
+def get_policy_cached(policy_arn):
+    return _cached_iam_call('get_policy', PolicyArn=policy_arn)
+
+
+# Poll DynamoDB table status every second instead of the default 20 seconds
+DYNAMODB_WAITER_CONFIG = {'Delay': 1, 'MaxAttempts': 60}
+
+# Number of concurrent IAM requests used when tearing down roles and policies
+IAM_TEARDOWN_WORKERS = 16
+
+# Backoff schedule used while waiting for a freshly created IAM role to propagate. The delays add up
+# to 12.6s, more than the 10s a new role can take before Lambda accepts it as an execution role
+ROLE_PROPAGATION_DELAYS = (0.2, 0.4, 0.8, 1.6, 3.2, 6.4)
+
+
+def wait_for_role(role_name):
+    # Poll until the role is visible instead of sleeping a fixed amount of time
+    for delay in ROLE_PROPAGATION_DELAYS + (None,):
+        try:
+            _client('iam').get_role(RoleName=role_name)
+            return
+        except _client('iam').exceptions.NoSuchEntityException:
+            if delay is None:
+                logger.warning("Role %s is still not visible after %.1fs",
+                               role_name, sum(ROLE_PROPAGATION_DELAYS))
+                return
+            time.sleep(delay)
+
+
 def create_dynamodb(table_name):
     try:
-        table = dynamodb_resource.create_table(
+        _resource('dynamodb').create_table(
             TableName=table_name,
             KeySchema=[
                 {
@@ -48,36 +202,49 @@ def create_dynamodb(table_name):
         )
 
         # Wait for the table to be created
-        print(f'Creating table {table_name}...')
-        table.wait_until_exists()
-        print(f'Table {table_name} created successfully!')
-    except dynamodb_client.exceptions.ResourceInUseException:
-        print(f'Table {table_name} already exists, skipping table creation step')
+        logger.debug('Creating table %s...', table_name)
+        waiter = _client('dynamodb').get_waiter('table_exists')
+        waiter.wait(TableName=table_name, WaiterConfig=DYNAMODB_WAITER_CONFIG)
+        logger.info('Table %s created successfully!', table_name)
+    except _client('dynamodb').exceptions.ResourceInUseException:
+        logger.info('Table %s already exists, skipping table creation step', table_name)
+
+
+@functools.lru_cache(maxsize=1)
+def _lambda_zip(path, mtime):
+    # mtime is part of the cache key so an edited source file is packaged again
+    s = BytesIO()
+    with zipfile.ZipFile(s, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as z:
+        z.write(path)
+    return s.getvalue()
 
 
 def create_lambda(lambda_function_name, lambda_iam_role):
     # add to function
 
     # Package up the lambda function code
-    s = BytesIO()
-    z = zipfile.ZipFile(s, 'w')
-    z.write("lambda_function.py")
-    z.close()
-    zip_content = s.getvalue()
+    zip_content = _lambda_zip("lambda_function.py", os.path.getmtime("lambda_function.py"))
     try:
-        # Create Lambda Function
-        lambda_function = lambda_client.create_function(
-            FunctionName=lambda_function_name,
-            Runtime='python3.12',
-            Timeout=60,
-            Role=lambda_iam_role['Role']['Arn'],
-            Code={'ZipFile': zip_content},
-            Handler='lambda_function.lambda_handler',
-            Tags=standard_tags
-        )
-    except lambda_client.exceptions.ResourceConflictException:
-        print("Lambda function already exists, retrieving it")
-        lambda_function = lambda_client.get_function(
+        # Create Lambda Function, retrying while the new execution role is not yet assumable
+        for delay in ROLE_PROPAGATION_DELAYS + (None,):
+            try:
+                lambda_function = _client('lambda').create_function(
+                    FunctionName=lambda_function_name,
+                    Runtime='python3.12',
+                    Timeout=60,
+                    Role=lambda_iam_role['Role']['Arn'],
+                    Code={'ZipFile': zip_content},
+                    Handler='lambda_function.lambda_handler',
+                    Tags=standard_tags
+                )
+                break
+            except _client('lambda').exceptions.InvalidParameterValueException:
+                if delay is None:
+                    raise
+                time.sleep(delay)
+    except _client('lambda').exceptions.ResourceConflictException:
+        logger.info("Lambda function already exists, retrieving it")
+        lambda_function = _client('lambda').get_function(
             FunctionName=lambda_function_name
         )
         lambda_function = lambda_function['Configuration']
@@ -90,34 +257,19 @@ def create_lambda_role(agent_name, dynamodb_table_name):
     dynamodb_access_policy_name = f'{agent_name}-dynamodb-policy'
     # Create IAM Role for the Lambda function
     try:
-        assume_role_policy_document = {
-            "Version": "2012-10-17",
-            "Statement": [
-                {
-                    "Effect": "Allow",
-                    "Principal": {
-                        "Service": "lambda.amazonaws.com"
-                    },
-                    "Action": "sts:AssumeRole"
-                }
-            ]
-        }
-
-        assume_role_policy_document_json = json.dumps(assume_role_policy_document)
-
-        lambda_iam_role = iam_client.create_role(
+        lambda_iam_role = _client('iam').create_role(
             RoleName=lambda_function_role,
-            AssumeRolePolicyDocument=assume_role_policy_document_json,
+            AssumeRolePolicyDocument=_LAMBDA_ASSUME_POLICY_JSON,
             Tags=standard_tags_kv
         )
 
-        # Pause to make sure role is created
-        time.sleep(10)
-    except iam_client.exceptions.EntityAlreadyExistsException:
-        lambda_iam_role = iam_client.get_role(RoleName=lambda_function_role)
+        # Make sure role is created
+        wait_for_role(lambda_function_role)
+    except _client('iam').exceptions.EntityAlreadyExistsException:
+        lambda_iam_role = get_role_cached(lambda_function_role)
 
     # Attach the AWSLambdaBasicExecutionRole policy
-    iam_client.attach_role_policy(
+    _client('iam').attach_role_policy(
         RoleName=lambda_function_role,
         PolicyArn='arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole'
     )
@@ -134,39 +286,39 @@ def create_lambda_role(agent_name, dynamodb_table_name):
                     "dynamodb:DeleteItem"
                 ],
                 "Resource": "arn:aws:dynamodb:{}:{}:table/{}".format(
-                    region_name, account_id, dynamodb_table_name
+                    region_name, _account_id(), dynamodb_table_name
                 )
             }
         ]
     }
+    dynamodb_access_policy_json = dumps_policy(dynamodb_access_policy)
 
     # Create the policy
-    dynamodb_access_policy_json = json.dumps(dynamodb_access_policy)
     try:
-        dynamodb_access_policy = iam_client.create_policy(
+        dynamodb_access_policy = _client('iam').create_policy(
             PolicyName=dynamodb_access_policy_name,
             PolicyDocument=dynamodb_access_policy_json
         )
-    except iam_client.exceptions.EntityAlreadyExistsException:
-        dynamodb_access_policy = iam_client.get_policy(
-            PolicyArn=f"arn:aws:iam::{account_id}:policy/{dynamodb_access_policy_name}"
+    except _client('iam').exceptions.EntityAlreadyExistsException:
+        dynamodb_access_policy = get_policy_cached(
+            _policy_arn(dynamodb_access_policy_name)
         )
 
     # Attach the policy to the Lambda function's role
-    iam_client.attach_role_policy(
+    _client('iam').attach_role_policy(
         RoleName=lambda_function_role,
         PolicyArn=dynamodb_access_policy['Policy']['Arn']
     )
     return lambda_iam_role
 
 
-def invoke_agent_helper(query, session_id, agent_id, alias_id, enable_trace=False, session_state=None):
+def invoke_agent_stream(query, session_id, agent_id, alias_id, enable_trace=False, session_state=None):
     end_session: bool = False
     if not session_state:
         session_state = {}
 
     # invoke the agent API
-    agent_response = bedrock_agent_runtime_client.invoke_agent(
+    agent_response = _client('bedrock-agent-runtime').invoke_agent(
         inputText=query,
         agentId=agent_id,
         agentAliasId=alias_id,
@@ -176,24 +328,29 @@ def invoke_agent_helper(query, session_id, agent_id, alias_id, enable_trace=Fals
         sessionState=session_state
     )
 
-    if enable_trace:
-        logger.info(pprint.pprint(agent_response))
+    if enable_trace and logger.isEnabledFor(logging.INFO):
+        logger.info("%s", json.dumps(agent_response, indent=2, default=str))
 
     event_stream = agent_response['completion']
+    # A multi-byte character can be split across chunks, so decode incrementally
+    decoder = codecs.getincrementaldecoder('utf-8')()
     try:
+        # Yield every chunk as it arrives, the stream ends when the request finished successfully
         for event in event_stream:
             if 'chunk' in event:
-                data = event['chunk']['bytes']
+                text = decoder.decode(event['chunk']['bytes'], final=False)
                 if enable_trace:
-                    logger.info(f"Final answer ->\n{data.decode('utf8')}")
-                agent_answer = data.decode('utf8')
-                return agent_answer
-                # End event indicates that the request finished successfully
+                    logger.info("Final answer ->\n%s", text)
+                if text:
+                    yield text
             elif 'trace' in event:
-                if enable_trace:
-                    logger.info(json.dumps(event['trace'], indent=2, default=str))
+                if enable_trace and logger.isEnabledFor(logging.INFO):
+                    logger.info("%s", json.dumps(event['trace'], indent=2, default=str))
             else:
                 raise Exception("unexpected event.", event)
+        text = decoder.decode(b'', final=True)
+        if text:
+            yield text
     except EventStreamError as e:
         if 'throttlingException' in str(e):
             raise Exception("Throttling occured, please run the code in this cell again.") from None
@@ -203,46 +360,121 @@ def invoke_agent_helper(query, session_id, agent_id, alias_id, enable_trace=Fals
         raise Exception("unexpected event.", e)
 
 
-def delete_role_with_all_policies(role_name):
+# Identical invocations that are in flight (or just finished) share one Bedrock round trip
+INVOKE_DEDUP_TTL = 2.0
+INVOKE_DEDUP_MAXSIZE = 256
+_inflight_invocations = {}
+_recent_invocations = {}
+_invocations_lock = threading.Lock()
+
+
+def _remember_invocation(key, answer):
+    now = time.monotonic()
+    for recent_key, (timestamp, _) in list(_recent_invocations.items()):
+        if now - timestamp >= INVOKE_DEDUP_TTL:
+            del _recent_invocations[recent_key]
+    _recent_invocations[key] = (now, answer)
+    if len(_recent_invocations) > INVOKE_DEDUP_MAXSIZE:
+        del _recent_invocations[next(iter(_recent_invocations))]
+
+
+def invoke_agent_helper(query, session_id, agent_id, alias_id, enable_trace=False, session_state=None):
+    key = (
+        query, session_id, agent_id, alias_id, enable_trace,
+        json.dumps(session_state or {}, sort_keys=True, default=str)
+    )
+    with _invocations_lock:
+        recent = _recent_invocations.get(key)
+        if recent and time.monotonic() - recent[0] < INVOKE_DEDUP_TTL:
+            return recent[1]
+        future = _inflight_invocations.get(key)
+        is_owner = future is None
+        if is_owner:
+            future = Future()
+            _inflight_invocations[key] = future
+
+    if not is_owner:
+        return future.result()
 
-    # List and detach all attached managed policies
     try:
-        attached_policies = iam_client.list_attached_role_policies(RoleName=role_name)
-        for policy in attached_policies['AttachedPolicies']:
-            policy_arn = policy['PolicyArn']
-            iam_client.detach_role_policy(
-                RoleName=role_name,
-                PolicyArn=policy_arn
-            )
+        answer = "".join(invoke_agent_stream(query, session_id, agent_id, alias_id, enable_trace, session_state))
+        with _invocations_lock:
+            _remember_invocation(key, answer)
+        future.set_result(answer)
+        return answer
+    except BaseException as e:
+        # Also resolve the future on KeyboardInterrupt, waiters must never block on it forever
+        future.set_exception(e)
+        raise
+    finally:
+        with _invocations_lock:
+            _inflight_invocations.pop(key, None)
+
+
+async def invoke_agent_helper_async(query, session_id, agent_id, alias_id, enable_trace=False, session_state=None):
+    # botocore is blocking, so run the call in a worker thread; the pooled client
+    # lets many invocations be awaited concurrently (e.g. with asyncio.gather)
+    return await asyncio.to_thread(
+        invoke_agent_helper, query, session_id, agent_id, alias_id, enable_trace, session_state
+    )
 
-            # Delete non-default versions first
-            versions = iam_client.list_policy_versions(PolicyArn=policy_arn)
-            for version in versions['Versions']:
-                if not version['IsDefaultVersion']:
-                    iam_client.delete_policy_version(
-                        PolicyArn=policy_arn,
-                        VersionId=version['VersionId']
-                    )
-
-            iam_client.delete_policy(
-                PolicyArn=policy_arn
-            )
-            policy_name = policy['PolicyName']
-            print(f"Successfully deleted policy: {policy_name}")
-
-        inline_policies = iam_client.list_role_policies(RoleName=role_name)
-        for policy_name in inline_policies['PolicyNames']:
-            iam_client.delete_role_policy(
-                RoleName=role_name,
-                PolicyName=policy_name
+
+def _delete_attached_policy(role_name, policy):
+    policy_arn = policy['PolicyArn']
+    _client('iam').detach_role_policy(
+        RoleName=role_name,
+        PolicyArn=policy_arn
+    )
+
+    # Delete non-default versions first
+    versions = _client('iam').list_policy_versions(PolicyArn=policy_arn)
+    for version in versions['Versions']:
+        if not version['IsDefaultVersion']:
+            _client('iam').delete_policy_version(
+                PolicyArn=policy_arn,
+                VersionId=version['VersionId']
             )
-            print(f"Successfully deleted policy: {policy_name}")
 
-        iam_client.delete_role(RoleName=role_name)
-        print(f"Successfully deleted role: {role_name}")
-    except iam_client.exceptions.NoSuchEntityException:
+    _client('iam').delete_policy(
+        PolicyArn=policy_arn
+    )
+    _invalidate_iam_cache(policy_arn)
+    logger.debug("Successfully deleted policy: %s", policy['PolicyName'])
+
+
+def _delete_inline_policy(role_name, policy_name):
+    _client('iam').delete_role_policy(
+        RoleName=role_name,
+        PolicyName=policy_name
+    )
+    logger.debug("Successfully deleted policy: %s", policy_name)
+
+
+def delete_role_with_all_policies(role_name):
+
+    # Detach and delete all managed and inline policies concurrently, the role goes last
+    try:
+        attached_policies = _client('iam').list_attached_role_policies(RoleName=role_name)
+        inline_policies = _client('iam').list_role_policies(RoleName=role_name)
+        with ThreadPoolExecutor(max_workers=IAM_TEARDOWN_WORKERS) as executor:
+            futures = [
+                executor.submit(_delete_attached_policy, role_name, policy)
+                for policy in attached_policies['AttachedPolicies']
+            ]
+            futures += [
+                executor.submit(_delete_inline_policy, role_name, policy_name)
+                for policy_name in inline_policies['PolicyNames']
+            ]
+            for future in as_completed(futures):
+                future.result()
+
+        _client('iam').delete_role(RoleName=role_name)
+        logger.info("Successfully deleted role %s and its %d policies", role_name, len(futures))
+    except _client('iam').exceptions.NoSuchEntityException:
         # There was no role to delete
         pass
+    finally:
+        _invalidate_iam_cache(role_name)
 
 
 def create_agent_role(agent_name, agent_foundation_model):
@@ -252,158 +484,139 @@ def create_agent_role(agent_name, agent_foundation_model):
     # delete role if it existed
     delete_role_with_all_policies(agent_role_name)
 
-    statements = []
-
     # Create IAM policies for agent
+    inference_profile_arn = f"arn:aws:bedrock:{region_name}:{_account_id()}:inference-profile/{agent_foundation_model}"
+    inference_profile_actions = [
+        "bedrock:InvokeModel",
+        "bedrock:InvokeModelWithResponseStream",
+        "bedrock:GetInferenceProfile"
+    ]
     if agent_foundation_model.startswith('us.'):
-        statements.append({
-			"Effect": "Allow",
-			"Action": [
-				"bedrock:InvokeModel",
-				"bedrock:InvokeModelWithResponseStream",
-				"bedrock:GetInferenceProfile"
-			],
-			"Resource": [
-				"*"
-			],
-			"Condition": {
-				"StringLike": {
-					"bedrock:InferenceProfileArn": f"arn:aws:bedrock:{region_name}:{account_id}:inference-profile/{agent_foundation_model}"
-				}
-			}
-		})
-        statements.append({
-			"Effect": "Allow",
-			"Action": [
-				"bedrock:InvokeModel",
-				"bedrock:InvokeModelWithResponseStream",
-				"bedrock:GetInferenceProfile"
-			],
-			"Resource": [
-				f"arn:aws:bedrock:{region_name}:{account_id}:inference-profile/{agent_foundation_model}"
-			]
-		})
-
+        # The cross-region profile routes to the underlying model in any of its regions
+        base_model_id = agent_foundation_model.split('.', 1)[1]
+        statements = [
+            {
+                "Effect": "Allow",
+                "Action": inference_profile_actions,
+                "Resource": [
+                    inference_profile_arn,
+                    f"arn:aws:bedrock:*::foundation-model/{base_model_id}"
+                ]
+            }
+        ]
     else:
-        statements.append({
-            "Sid": "AmazonBedrockAgentBedrockFoundationModelPolicy",
-            "Effect": "Allow",
-            "Action": [
-                "bedrock:InvokeModel",
-                "bedrock:InvokeModelWithResponseStream"
-            ],
-            "Resource": [
-                f"arn:aws:bedrock:{region_name}::foundation-model/{agent_foundation_model}"
-            ]
-        })
+        statements = [
+            {
+                "Sid": "AmazonBedrockAgentBedrockFoundationModelPolicy",
+                "Effect": "Allow",
+                "Action": [
+                    "bedrock:InvokeModel",
+                    "bedrock:InvokeModelWithResponseStream"
+                ],
+                "Resource": [
+                    f"arn:aws:bedrock:{region_name}::foundation-model/{agent_foundation_model}"
+                ]
+            }
+        ]
 
     bedrock_agent_bedrock_allow_policy_statement = {
         "Version": "2012-10-17",
         "Statement": statements
     }
 
-    bedrock_policy_json = json.dumps(bedrock_agent_bedrock_allow_policy_statement)
+    bedrock_policy_json = dumps_policy(bedrock_agent_bedrock_allow_policy_statement)
 
-    agent_bedrock_policy = iam_client.create_policy(
+    agent_bedrock_policy = _client('iam').create_policy(
         PolicyName=agent_bedrock_allow_policy_name,
         PolicyDocument=bedrock_policy_json,
         Tags=standard_tags_kv
     )
                     
     # Create IAM Role for the agent and attach IAM policies
-    assume_role_policy_document = {
-        "Version": "2012-10-17",
-        "Statement": [{
-            "Effect": "Allow",
-            "Principal": {
-                "Service": "bedrock.amazonaws.com"
-            },
-            "Action": "sts:AssumeRole"
-        }]
-    }
-
-    assume_role_policy_document_json = json.dumps(assume_role_policy_document)
-    agent_role = iam_client.create_role(
+    agent_role = _client('iam').create_role(
         RoleName=agent_role_name,
-        AssumeRolePolicyDocument=assume_role_policy_document_json,
+        AssumeRolePolicyDocument=_BEDROCK_ASSUME_POLICY_JSON,
         Tags=standard_tags_kv
     )
 
-    # Pause to make sure role is created
-    time.sleep(10)
+    # Make sure role is created
+    wait_for_role(agent_role_name)
 
-    iam_client.attach_role_policy(
+    _client('iam').attach_role_policy(
         RoleName=agent_role_name,
         PolicyArn=agent_bedrock_policy['Policy']['Arn']
     )
 
-    print(f"Created role {agent_role_name}")
+    logger.info("Created role %s", agent_role_name)
     return agent_role
 
 
+def _try_iam_call(error_message, operation, **kwargs):
+    try:
+        getattr(_client('iam'), operation)(**kwargs)
+    except Exception as e:
+        logger.warning("%s\n%s", error_message, e)
+
+
 def delete_agent_roles_and_policies(agent_name, kb_policy_name):
     agent_bedrock_allow_policy_name = f"{agent_name}-ba"
     agent_role_name = f'AmazonBedrockExecutionRoleForAgents_{agent_name}'
     dynamodb_access_policy_name = f'{agent_name}-dynamodb-policy'
     lambda_function_role = f'{agent_name}-lambda-role'
 
-    for policy in [agent_bedrock_allow_policy_name, kb_policy_name]:
-        try:
-            iam_client.detach_role_policy(
-                RoleName=agent_role_name,
-                PolicyArn=f'arn:aws:iam::{account_id}:policy/{policy}'
+    # The attached policies are known by name, so they are detached without listing them first
+    detachments = [
+        (agent_role_name, policy, _policy_arn(policy))
+        for policy in [agent_bedrock_allow_policy_name, kb_policy_name]
+    ] + [
+        (lambda_function_role, dynamodb_access_policy_name, _policy_arn(dynamodb_access_policy_name)),
+        (lambda_function_role, 'AWSLambdaBasicExecutionRole',
+         'arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole'),
+    ]
+
+    with ThreadPoolExecutor(max_workers=IAM_TEARDOWN_WORKERS) as executor:
+        # All policies must be detached before the roles and policies can be deleted
+        futures = [
+            executor.submit(
+                _try_iam_call, f"Could not detach {policy} from {role_name}",
+                'detach_role_policy', RoleName=role_name, PolicyArn=policy_arn
             )
-        except Exception as e:
-            print(f"Could not detach {policy} from {agent_role_name}")
-            print(e)
+            for role_name, policy, policy_arn in detachments
+        ]
+        for future in as_completed(futures):
+            future.result()
 
-    for policy in [dynamodb_access_policy_name]:
-        try:
-            iam_client.detach_role_policy(
-                RoleName=lambda_function_role,
-                PolicyArn=f'arn:aws:iam::{account_id}:policy/{policy}'
+        futures = [
+            executor.submit(
+                _try_iam_call, f"Could not delete role {role_name}",
+                'delete_role', RoleName=role_name
             )
-        except Exception as e:
-            print(f"Could not detach {policy} from {lambda_function_role}")
-            print(e)
-
-    try:
-        iam_client.detach_role_policy(
-            RoleName=lambda_function_role,
-            PolicyArn='arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole'
-        )
-    except Exception as e:
-        print(f"Could not detach AWSLambdaBasicExecutionRole from {lambda_function_role}")
-        print(e)
-
-    for role_name in [agent_role_name, lambda_function_role]:
-        try:
-            iam_client.delete_role(
-                RoleName=role_name
+            for role_name in [agent_role_name, lambda_function_role]
+        ]
+        futures += [
+            executor.submit(
+                _try_iam_call, f"Could not delete policy {policy}",
+                'delete_policy', PolicyArn=_policy_arn(policy)
             )
-        except Exception as e:
-            print(f"Could not delete role {role_name}")
-            print(e)
+            for policy in [agent_bedrock_allow_policy_name, kb_policy_name, dynamodb_access_policy_name]
+        ]
+        for future in as_completed(futures):
+            future.result()
 
-    for policy in [agent_bedrock_allow_policy_name, kb_policy_name, dynamodb_access_policy_name]:
-        try:
-            iam_client.delete_policy(
-                PolicyArn=f'arn:aws:iam::{account_id}:policy/{policy}'
-            )
-        except Exception as e:
-            print(f"Could not delete policy {policy}")
-            print(e)
+    _invalidate_iam_cache(
+        agent_role_name, lambda_function_role,
+        *[_policy_arn(policy)
+          for policy in [agent_bedrock_allow_policy_name, kb_policy_name, dynamodb_access_policy_name]]
+    )
+    logger.info("Deleted roles and policies of agent %s", agent_name)
 
 
-def clean_up_resources(
-        table_name, lambda_function, lambda_function_name, agent_action_group_response, agent_functions,
-        agent_id, kb_id, alias_id
-):
+def _delete_agent_resources(lambda_function, agent_action_group_response, agent_functions, agent_id, kb_id, alias_id):
     action_group_id = agent_action_group_response['agentActionGroup']['actionGroupId']
     action_group_name = agent_action_group_response['agentActionGroup']['actionGroupName']
     # Delete Agent Action Group, Agent Alias, and Agent
     try:
-        bedrock_agent_client.update_agent_action_group(
+        _client('bedrock-agent').update_agent_action_group(
             agentId=agent_id,
             agentVersion='DRAFT',
             actionGroupId= action_group_id,
@@ -416,38 +629,73 @@ def clean_up_resources(
             },
             actionGroupState='DISABLED',
         )
-        bedrock_agent_client.disassociate_agent_knowledge_base(
+        _client('bedrock-agent').disassociate_agent_knowledge_base(
             agentId=agent_id,
             agentVersion='DRAFT',
             knowledgeBaseId=kb_id
         )
-        bedrock_agent_client.delete_agent_action_group(
+        _client('bedrock-agent').delete_agent_action_group(
             agentId=agent_id,
             agentVersion='DRAFT',
             actionGroupId=action_group_id
         )
-        bedrock_agent_client.delete_agent_alias(
+        _client('bedrock-agent').delete_agent_alias(
             agentAliasId=alias_id,
             agentId=agent_id
         )
-        bedrock_agent_client.delete_agent(agentId=agent_id)
-        print(f"Agent {agent_id}, Agent Alias {alias_id}, and Action Group have been deleted.")
+        _client('bedrock-agent').delete_agent(agentId=agent_id)
+        logger.info("Agent %s, Agent Alias %s, and Action Group have been deleted.", agent_id, alias_id)
     except Exception as e:
-        print(f"Error deleting Agent resources: {e}")
+        logger.warning("Error deleting Agent resources: %s", e)
+
 
-    # Delete Lambda function
+def _delete_lambda_function(lambda_function_name):
     try:
-        lambda_client.delete_function(FunctionName=lambda_function_name)
-        print(f"Lambda function {lambda_function_name} has been deleted.")
+        _client('lambda').delete_function(FunctionName=lambda_function_name)
+        logger.info("Lambda function %s has been deleted.", lambda_function_name)
     except Exception as e:
-        print(f"Error deleting Lambda function {lambda_function_name}: {e}")
+        logger.warning("Error deleting Lambda function %s: %s", lambda_function_name, e)
 
-    # Delete DynamoDB table
+
+def _delete_dynamodb_table(table_name):
     try:
-        dynamodb_client.delete_table(TableName=table_name)
-        print(f"Table {table_name} is being deleted...")
-        waiter = dynamodb_client.get_waiter('table_not_exists')
-        waiter.wait(TableName=table_name)
-        print(f"Table {table_name} has been deleted.")
+        _client('dynamodb').delete_table(TableName=table_name)
+        logger.debug("Table %s is being deleted...", table_name)
+        waiter = _client('dynamodb').get_waiter('table_not_exists')
+        waiter.wait(TableName=table_name, WaiterConfig=DYNAMODB_WAITER_CONFIG)
+        logger.info("Table %s has been deleted.", table_name)
     except Exception as e:
-        print(f"Error deleting table {table_name}: {e}")
+        logger.warning("Error deleting table %s: %s", table_name, e)
+
+
+def clean_up_resources(
+        table_name, lambda_function, lambda_function_name, agent_action_group_response, agent_functions,
+        agent_id, kb_id, alias_id
+):
+    # The agent resources, the Lambda function and the DynamoDB table do not depend on each other,
+    # so they are deleted concurrently (threads keep this usable from inside a notebook event loop)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [
+            executor.submit(
+                _delete_agent_resources, lambda_function, agent_action_group_response, agent_functions,
+                agent_id, kb_id, alias_id
+            ),
+            executor.submit(_delete_lambda_function, lambda_function_name),
+            executor.submit(_delete_dynamodb_table, table_name),
+        ]
+        for future in as_completed(futures):
+            future.result()
+
+
+async def clean_up_resources_async(
+        table_name, lambda_function, lambda_function_name, agent_action_group_response, agent_functions,
+        agent_id, kb_id, alias_id
+):
+    await asyncio.gather(
+        asyncio.to_thread(
+            _delete_agent_resources, lambda_function, agent_action_group_response, agent_functions,
+            agent_id, kb_id, alias_id
+        ),
+        asyncio.to_thread(_delete_lambda_function, lambda_function_name),
+        asyncio.to_thread(_delete_dynamodb_table, table_name),
+    )
@@ -29,6 +29,28 @@ from util.model_selector import MODELS
 # Page config
 st.set_page_config(page_title="Strands Chatbot Demo", page_icon="🤖")
 
+
+@st.cache_data
+def build_model_options():
+    """Build the text model lookup and dropdown options once instead of on every rerun"""
+    text_models = {name: info for name, info in MODELS.items()
+                   if info['type'] == 'text'}
+
+    model_options = {}
+    for model_id, info in text_models.items():
+        display_name = f"{info['name']} - {info['description'][:50]}..."
+        model_options[display_name] = model_id
+    return text_models, model_options
+
+
+def get_boto3_session():
+    """Create a boto3 session, sessions are not thread-safe so each browser session gets its own"""
+    boto3_session = boto3.session.Session()
+    if not boto3_session.region_name:
+        boto3_session = boto3.session.Session(region_name="us-east-1")
+    return boto3_session
+
+
 # Title
 st.title("🤖 Strands SDK Chatbot Demo")
 st.markdown("Powered by Amazon Bedrock and Strands SDK")
@@ -38,13 +60,7 @@ with st.sidebar:
     st.header("Settings")
     
     # Create model options from our unified system
-    text_models = {name: info for name, info in MODELS.items() 
-                   if info['type'] == 'text'}
-    
-    model_options = {}
-    for model_id, info in text_models.items():
-        display_name = f"{info['name']} - {info['description'][:50]}..."
-        model_options[display_name] = model_id
+    text_models, model_options = build_model_options()
     
     # Model selection using our unified system
     selected_display_name = st.selectbox(
@@ -83,13 +99,12 @@ if "agent" not in st.session_state or st.session_state.get("current_model") != m
     try:
         st.session_state.current_model = model_id
 
-        boto3_session = boto3.session.Session()
-        region = boto3_session.region_name or "us-east-1"
-        
+        # The model and its boto3 session are created per browser session, so neither the
+        # temperature set below nor client creation is shared with other users
         bedrock_model = BedrockModel(
             model_id=st.session_state.current_model,
             temperature=temperature,
-            region=region
+            boto_session=get_boto3_session()
         )
 
         st.session_state.agent = Agent(
@@ -105,6 +120,7 @@ if "agent" not in st.session_state or st.session_state.get("current_model") != m
         st.stop()
 
 # Display chat messages
+# Streamlit clears the page on every rerun, so the history is replayed here for display only
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
@@ -122,6 +138,9 @@ if prompt := st.chat_input("What would you like to chat about?"):
     with st.chat_message("assistant"):
         with st.spinner("Thinking..."):
             try:
+                # Temperature is applied per call on this session's own model, no rebuild needed
+                st.session_state.agent.model.update_config(temperature=temperature)
+                # Only the new prompt is sent, the agent keeps the conversation context itself
                 response = st.session_state.agent(prompt)
                 st.markdown(response)
                 
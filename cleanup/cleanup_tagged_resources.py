@@ -1,39 +1,137 @@
-import re
+import argparse
+import asyncio
+import functools
+import itertools
+import json
+import queue
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
-aoss_client = boto3.client("opensearchserverless")
-bedrock_agent_client = boto3.client("bedrock-agent")
-iam_client = boto3.client("iam")
-bedrock_client = boto3.client("bedrock")
-lambda_client = boto3.client('lambda')
-dynamodb_client = boto3.client('dynamodb')
+# Number of concurrent requests used for tag lookups and deletions
+MAX_WORKERS = 16
 
-def get_tagged_resources(name, value):
-    """Find all resources with specified tag name and value"""
-    client = boto3.client("resourcegroupstaggingapi")
-    resources = []
+# Larger connection pool so concurrent requests are not queued on connections, and adaptive
+# retries so throttling caused by the fan out is absorbed by botocore
+client_config = Config(max_pool_connections=32, retries={"mode": "adaptive", "max_attempts": 10})
+
+# Tag lookups are cached here when get_tagged_resources is called with a cache_ttl
+CACHE_DIR = Path.home() / ".cache" / "cleanup"
+
+_client_lock = threading.Lock()
+
+
+@functools.cache
+def _client(service_name, region_name=None):
+    """Create a client on first use, so only the services that are actually cleaned up are loaded"""
+    # client creation on the shared default session is not thread-safe
+    with _client_lock:
+        return boto3.client(service_name, region_name=region_name, config=client_config)
+
+
+def _resource_id(resource, prefix):
+    """Return the part of resource after prefix (e.g. "collection/"), None if it has another type"""
+    if resource.startswith(prefix) and len(resource) > len(prefix):
+        return resource[len(prefix):]
+    return None
+
+
+def _tagged_arns(client, tag_filters, **kwargs):
+    """Yield the ARNs of all resources matching the tag filters"""
+    paginator = client.get_paginator("get_resources")
+    for page in paginator.paginate(TagFilters=tag_filters, **kwargs):
+        for r in page["ResourceTagMappingList"]:
+            yield r["ResourceARN"]
+
+
+def iter_tagged_resources(name, value, scan_iam_roles=False):
+    """Yield the ARNs of all resources with specified tag name and value, page by page
+
+    IAM roles are found through the Resource Groups Tagging API, which indexes IAM (a global
+    service) in us-east-1. Set scan_iam_roles to additionally check the tags of every role.
+    """
+    tag_filters = [{"Key": name, "Values": [value]}]
+    # Roles can be returned by more than one of the lookups below
+    seen = set()
+
+    def unseen(arns):
+        for arn in arns:
+            if arn not in seen:
+                seen.add(arn)
+                yield arn
 
     try:
-        paginator = client.get_paginator("get_resources")
-        for page in paginator.paginate(TagFilters=[{"Key": name, "Values": [value]}]):
-            mapping_list = page["ResourceTagMappingList"]
-            resources.extend([r["ResourceARN"] for r in mapping_list])
+        yield from unseen(_tagged_arns(_client("resourcegroupstaggingapi"), tag_filters))
     except ClientError as e:
         print(f"Error finding tagged resources: {e}")
 
     try:
-        paginator = iam_client.get_paginator("list_roles")
-        for page in paginator.paginate():
-            for role in page["Roles"]:
-                tags = iam_client.list_role_tags(RoleName=role["RoleName"])["Tags"]
-                if any(tag["Key"] == name and tag["Value"] == value for tag in tags):
-                    resources.append(role["Arn"])
+        iam_tagging_client = _client("resourcegroupstaggingapi", region_name="us-east-1")
+        yield from unseen(_tagged_arns(iam_tagging_client, tag_filters, ResourceTypeFilters=["iam:role"]))
     except ClientError as e:
-        print(f"Error listing roles: {e}")
+        print(f"Error finding tagged roles: {e}")
+
+    if scan_iam_roles:
+        try:
+            paginator = _client("iam").get_paginator("list_roles")
+            roles = [role for page in paginator.paginate() for role in page["Roles"]]
+            # Fetch the tags of all roles concurrently, the lookups are independent
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                role_tags = executor.map(
+                    lambda role: (role["Arn"], _client("iam").list_role_tags(RoleName=role["RoleName"])["Tags"]),
+                    roles
+                )
+                yield from unseen(
+                    role_arn for role_arn, tags in role_tags
+                    if any(tag["Key"] == name and tag["Value"] == value for tag in tags)
+                )
+        except ClientError as e:
+            print(f"Error listing roles: {e}")
 
-    return resources
+
+def _cache_path(name, value, scan_iam_roles):
+    # Tag names and values may contain "/", so both are encoded into a single file name. quote()
+    # never leaves "=" or "+" unescaped, so neither the separator nor the suffix can collide
+    suffix = "+iam" if scan_iam_roles else ""
+    name, value = (urllib.parse.quote(part, safe="") for part in (name, value))
+    return CACHE_DIR / f"{name}={value}{suffix}.json"
+
+
+def clear_cache():
+    """Remove all cached tag lookups, they are stale as soon as anything was deleted"""
+    # rglob also catches nested files written before the tag name and value were encoded
+    for path in CACHE_DIR.rglob("*.json"):
+        path.unlink(missing_ok=True)
+
+
+def get_tagged_resources(name, value, scan_iam_roles=False, cache_ttl=None):
+    """Find all resources with specified tag name and value
+
+    Set cache_ttl (seconds) to reuse the result of a previous lookup from ~/.cache/cleanup while
+    iterating, e.g. together with delete_resources(arns, dry_run=True). Lookups are never cached
+    by default, and every delete run that is not a dry run clears the cache.
+    """
+    if not cache_ttl:
+        return list(iter_tagged_resources(name, value, scan_iam_roles))
+
+    path = _cache_path(name, value, scan_iam_roles)
+    try:
+        if time.time() - path.stat().st_mtime < cache_ttl:
+            print(f"Using cached resources from {path}")
+            return json.loads(path.read_text())
+    except (OSError, ValueError):
+        pass
+
+    arns = list(iter_tagged_resources(name, value, scan_iam_roles))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(arns))
+    return arns
 
 
 def parse_arn(arn):
@@ -50,13 +148,12 @@ def parse_arn(arn):
 
 def delete_collection(arn, service, resource):
     """Delete OpenSearch Serverless collection and associated policies"""
-    match = re.match(r"^collection/(.+)", resource)
-    if service == "aoss" and match:
+    collection_id = _resource_id(resource, "collection/")
+    if service == "aoss" and collection_id:
         print(f"Deleting: {arn}")
-        collection_id = match.group(1)
 
         # Show collection info
-        collections = aoss_client.batch_get_collection(ids=[collection_id])[
+        collections = _client("opensearchserverless").batch_get_collection(ids=[collection_id])[
             "collectionDetails"
         ]
         if len(collections) == 1:
@@ -64,7 +161,7 @@ def delete_collection(arn, service, resource):
             resource_name = f"collection/{collection['name']}"
             # Find and delete security (network/ access) policies for this collection
             for policy_type in ["encryption", "network"]:
-                security_policies = aoss_client.list_security_policies(
+                security_policies = _client("opensearchserverless").list_security_policies(
                     type=policy_type, resource=[resource_name]
                 )["securityPolicySummaries"]
                 for policy in security_policies:
@@ -72,79 +169,135 @@ def delete_collection(arn, service, resource):
                     print(
                         f"-> Deleting OpenSearchServerless {policy_type} policy: {policy_name}"
                     )
-                    aoss_client.delete_security_policy(
+                    _client("opensearchserverless").delete_security_policy(
                         name=policy_name, type=policy_type
                     )
-            access_policies = aoss_client.list_access_policies(
+            access_policies = _client("opensearchserverless").list_access_policies(
                 type="data", resource=[resource_name]
             )["accessPolicySummaries"]
             for policy in access_policies:
                 policy_name = policy["name"]
                 print(f"-> Deleting OpenSearchServerless data policy: {policy_name}")
-                aoss_client.delete_access_policy(name=policy_name, type="data")
+                _client("opensearchserverless").delete_access_policy(name=policy_name, type="data")
             print(f"-> Deleting OpenSearch Serverless collection: {resource_name}")
-            aoss_client.delete_collection(id=collection_id)
+            _client("opensearchserverless").delete_collection(id=collection_id)
 
 
 def delete_guardrail(arn, service, resource):
     """Delete Bedrock guardrail"""
-    match = re.match(r"^guardrail/(.+)", resource)
-    if service == "bedrock" and match:
+    guardrail_id = _resource_id(resource, "guardrail/")
+    if service == "bedrock" and guardrail_id:
         print(f"Deleting: {arn}")
-        guardrail_id = match.group(1)
         print(f"-> Deleting guardrail: {guardrail_id}")
-        bedrock_client.delete_guardrail(guardrailIdentifier=arn)
+        _client("bedrock").delete_guardrail(guardrailIdentifier=arn)
+
+def _retain_and_delete_ds(kb_id, ds):
+    """Delete a knowledge base data source, keeping the data in its vector store"""
+    # Set deletion policy to RETAIN before deletion
+    # Setting deletion policy to RETAIN for data source first
+    ds_details = _client("bedrock-agent").get_data_source(
+        knowledgeBaseId=kb_id, dataSourceId=ds["dataSourceId"]
+    )["dataSource"]
+    _client("bedrock-agent").update_data_source(
+        knowledgeBaseId=kb_id,
+        dataSourceId=ds["dataSourceId"],
+        name=ds_details["name"],
+        dataSourceConfiguration=ds_details["dataSourceConfiguration"],
+        vectorIngestionConfiguration=ds_details["vectorIngestionConfiguration"],
+        dataDeletionPolicy="RETAIN",
+    )
+    print(f"-> Deleting data source: {ds['name']}")
+    _client("bedrock-agent").delete_data_source(
+        knowledgeBaseId=kb_id, dataSourceId=ds["dataSourceId"]
+    )
 
 def delete_knowledgebase(arn, service, resource):
     """Delete Bedrock knowledge base and all data sources"""
-    match = re.match(r"^knowledge-base/(.+)", resource)
-    if service == "bedrock" and match:
+    kb_id = _resource_id(resource, "knowledge-base/")
+    if service == "bedrock" and kb_id:
         print(f"Deleting: {arn}")
-        kb_id = match.group(1)
-        kb = bedrock_agent_client.get_knowledge_base(knowledgeBaseId=kb_id)[
+        kb = _client("bedrock-agent").get_knowledge_base(knowledgeBaseId=kb_id)[
             "knowledgeBase"
         ]
-        data_sources = bedrock_agent_client.list_data_sources(knowledgeBaseId=kb_id)[
+        data_sources = _client("bedrock-agent").list_data_sources(knowledgeBaseId=kb_id)[
             "dataSourceSummaries"
         ]
-        for ds in data_sources:
-            # Set deletion policy to RETAIN before deletion
-            # Setting deletion policy to RETAIN for data source first
-            ds_details = bedrock_agent_client.get_data_source(
-                knowledgeBaseId=kb_id, dataSourceId=ds["dataSourceId"]
-            )["dataSource"]
-            bedrock_agent_client.update_data_source(
-                knowledgeBaseId=kb_id,
-                dataSourceId=ds["dataSourceId"],
-                name=ds_details["name"],
-                dataSourceConfiguration=ds_details["dataSourceConfiguration"],
-                vectorIngestionConfiguration=ds_details["vectorIngestionConfiguration"],
-                dataDeletionPolicy="RETAIN",
-            )
-            print(f"-> Deleting data source: {ds['name']}")
-            bedrock_agent_client.delete_data_source(
-                knowledgeBaseId=kb_id, dataSourceId=ds["dataSourceId"]
-            )
+        # Data sources are independent, delete them concurrently
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda ds: _retain_and_delete_ds(kb_id, ds), data_sources))
         print(f"-> Deleting knowledge base: {kb['name']}")
-        bedrock_agent_client.delete_knowledge_base(knowledgeBaseId=kb_id)
+        _client("bedrock-agent").delete_knowledge_base(knowledgeBaseId=kb_id)
 
 
-def delete_bucket(arn, service, resource):
+def _object_batches(s3_client, bucket_name):
+    """Yield batches of up to 1000 objects of a bucket that never had versioning enabled"""
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket_name):
+        if "Contents" in page:
+            yield [{"Key": obj["Key"]} for obj in page["Contents"]]
+
+
+def _object_version_batches(s3_client, bucket_name):
+    """Yield batches of up to 1000 (the delete_objects limit) object versions and delete markers"""
+    paginator = s3_client.get_paginator("list_object_versions")
+    for page in paginator.paginate(Bucket=bucket_name):
+        # MaxKeys (1000) caps versions and delete markers together, so every page is one batch
+        objects = [
+            {"Key": version["Key"], "VersionId": version["VersionId"]}
+            for version in itertools.chain(page.get("Versions", ()), page.get("DeleteMarkers", ()))
+        ]
+        if objects:
+            yield objects
+
+
+def _delete_object_batches(s3_client, bucket_name, batches, max_workers=8):
+    """Delete object batches concurrently while the next pages are still being listed"""
+    # Bounded queue, listing pauses when the delete workers fall behind
+    batch_queue = queue.Queue(maxsize=4)
+    errors = []
+
+    def worker():
+        while (objects := batch_queue.get()) is not None:
+            if errors:
+                # keep draining the queue so the producer never blocks
+                continue
+            try:
+                response = s3_client.delete_objects(
+                    Bucket=bucket_name, Delete={"Objects": objects, "Quiet": True}
+                )
+                for error in response.get("Errors", []):
+                    print(f"-> Could not delete {error['Key']}: {error['Message']}")
+            except Exception as e:
+                errors.append(e)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        workers = [executor.submit(worker) for _ in range(max_workers)]
+        try:
+            for objects in batches:
+                batch_queue.put(objects)
+        finally:
+            for _ in workers:
+                batch_queue.put(None)
+    if errors:
+        raise errors[0]
+
+
+def delete_bucket(arn, service, resource, s3_client=None):
     """Delete S3 bucket after emptying all objects"""
     if service == "s3":
         print(f"Deleting: {arn}")
         bucket_name = resource  # For S3, resource is just the bucket name
-        s3_client = boto3.client("s3")
+        # One shared client for all buckets instead of loading the S3 model per bucket
+        s3_client = s3_client or _client("s3")
 
-        # Empty the bucket first
+        # Empty the bucket first, including all object versions and delete markers. A bucket that had
+        # versioning enabled (the status is then "Enabled" or "Suspended") can hold old versions
         print(f"-> Deleting all contained objects")
-        paginator = s3_client.get_paginator("list_objects_v2")
-        for page in paginator.paginate(Bucket=bucket_name):
-            if "Contents" in page:
-                objects = [{"Key": obj["Key"]} for obj in page["Contents"]]
-                s3_client.delete_objects(
-                    Bucket=bucket_name, Delete={"Objects": objects}
-                )
+        if "Status" in s3_client.get_bucket_versioning(Bucket=bucket_name):
+            batches = _object_version_batches(s3_client, bucket_name)
+        else:
+            batches = _object_batches(s3_client, bucket_name)
+        _delete_object_batches(s3_client, bucket_name, batches)
 
         print(f"-> Deleting S3 bucket: {bucket_name}")
         s3_client.delete_bucket(Bucket=bucket_name)
@@ -152,110 +305,220 @@ def delete_bucket(arn, service, resource):
 
 def delete_roles(arn, service, resource):
     """Delete IAM role after detaching policies and removing from instance profiles"""
-    match = re.match(r"^role/(.+)", resource)
-    if service == "iam" and match:
-        role_name = match.group(1)
+    role_name = _resource_id(resource, "role/")
+    if service == "iam" and role_name:
         if role_name.startswith('service-role/'):
             role_name = role_name.replace('service-role/', '')
 
         print(f"Deleting: {arn}")
 
         # Detach all managed policies
-        attached_policies = iam_client.list_attached_role_policies(RoleName=role_name)[
+        attached_policies = _client("iam").list_attached_role_policies(RoleName=role_name)[
             "AttachedPolicies"
         ]
         for policy in attached_policies:
             print(f"-> Detaching managed policy: {policy['PolicyName']}")
-            iam_client.detach_role_policy(
+            _client("iam").detach_role_policy(
                 RoleName=role_name, PolicyArn=policy["PolicyArn"]
             )
 
         # Delete all inline policies
-        inline_policies = iam_client.list_role_policies(RoleName=role_name)[
+        inline_policies = _client("iam").list_role_policies(RoleName=role_name)[
             "PolicyNames"
         ]
         for policy_name in inline_policies:
             print(f"-> Deleting inline policy: {policy_name}")
-            iam_client.delete_role_policy(RoleName=role_name, PolicyName=policy_name)
+            _client("iam").delete_role_policy(RoleName=role_name, PolicyName=policy_name)
 
         # Remove role from instance profiles
         try:
-            instance_profiles = iam_client.list_instance_profiles_for_role(
+            instance_profiles = _client("iam").list_instance_profiles_for_role(
                 RoleName=role_name
             )["InstanceProfiles"]
             for profile in instance_profiles:
                 print(
                     f"-> Removing role from instance profile: {profile['InstanceProfileName']}"
                 )
-                iam_client.remove_role_from_instance_profile(
+                _client("iam").remove_role_from_instance_profile(
                     InstanceProfileName=profile["InstanceProfileName"],
                     RoleName=role_name,
                 )
         except ClientError:
             pass
         print(f"-> Deleting role: {role_name}")
-        iam_client.delete_role(RoleName=role_name)
+        _client("iam").delete_role(RoleName=role_name)
 
 
 def delete_policy(arn, service, resource):
     """Delete IAM policy"""
-    match = re.match(r"^policy/(.+)", resource)
-    if service == "iam" and match:
+    policy_name = _resource_id(resource, "policy/")
+    if service == "iam" and policy_name:
         print(f"Deleting: {arn}")
-        policy_name = match.group(1)
-        versions = iam_client.list_policy_versions(PolicyArn=arn)['Versions']
+        versions = _client("iam").list_policy_versions(PolicyArn=arn)['Versions']
         for version in versions:
             if not version['IsDefaultVersion']:
                 print(f"-> Deleting IAM policy version: {version['VersionId']}")
-                iam_client.delete_policy_version(
+                _client("iam").delete_policy_version(
                     PolicyArn=arn,
                     VersionId=version['VersionId']
                 )
         print(f"-> Deleting IAM policy: {policy_name}")
-        iam_client.delete_policy(PolicyArn=arn)
+        _client("iam").delete_policy(PolicyArn=arn)
 
 def delete_function(arn, service, resource):
     """Delete Lambda function"""
-    match = re.match(r"^function:(.+)", resource)
-    if service == "lambda" and match:
+    function_name = _resource_id(resource, "function:")
+    if service == "lambda" and function_name:
         print(f"Deleting: {arn}")
-        function_name = match.group(1)
         print(f"-> Deleting Lambda function: {function_name}")
-        lambda_client.delete_function(FunctionName=function_name)
+        _client("lambda").delete_function(FunctionName=function_name)
 
 def delete_table(arn, service, resource):
     """Delete DynamoDB table"""
-    match = re.match(r"^table/(.+)", resource)
-    if service == "dynamodb" and match:
+    table_name = _resource_id(resource, "table/")
+    if service == "dynamodb" and table_name:
         print(f"Deleting: {arn}")
-        table_name = match.group(1)
         print(f"-> Deleting DynamoDB table: {table_name}")
-        dynamodb_client.delete_table(TableName=table_name)
+        _client("dynamodb").delete_table(TableName=table_name)
 
 def delete_agent(arn, service, resource):
     """Delete Bedrock Agent"""
-    match = re.match(r"^agent/(.+)", resource)
-    if service == "bedrock" and match:
+    agent_id = _resource_id(resource, "agent/")
+    if service == "bedrock" and agent_id:
         print(f"Deleting: {arn}")
-        agent_id = match.group(1)
         print(f"-> Deleting Bedrock Agent: {agent_id}")
-        bedrock_agent_client.delete_agent(agentId=agent_id)
-
-def delete_resources(arns):
-    """Delete all resources by ARN using appropriate deletion methods"""
-    delete_actions = [
-        delete_guardrail,
-        delete_collection,
-        delete_knowledgebase,
-        delete_bucket,
-        delete_function,
-        delete_roles,
-        delete_policy,
-        delete_table,
-        delete_agent
-    ]
-
-    for action in delete_actions:
-        for arn in arns:
-            service, resource = parse_arn(arn)
-            action(arn, service, resource)
+        _client("bedrock-agent").delete_agent(agentId=agent_id)
+
+# Maps "service:resource-type" of an ARN to its delete function, "*" matches any resource type
+DISPATCH = {
+    "aoss:collection": delete_collection,
+    "bedrock:guardrail": delete_guardrail,
+    "bedrock:knowledge-base": delete_knowledgebase,
+    "s3:*": delete_bucket,
+    "iam:role": delete_roles,
+    "iam:policy": delete_policy,
+    "lambda:function": delete_function,
+    "dynamodb:table": delete_table,
+    "bedrock:agent": delete_agent,
+}
+
+# Resources are deleted in waves, all resources of one wave are deleted concurrently.
+# Roles go after the Lambda functions and agents using them, and policies after the roles they are
+# detached from, since a policy that is still attached cannot be deleted.
+DELETE_WAVES = [
+    [delete_guardrail, delete_collection, delete_knowledgebase, delete_function, delete_table, delete_agent],
+    [delete_roles, delete_bucket],
+    [delete_policy],
+]
+
+
+def get_delete_action(service, resource):
+    """Look up the delete function for a parsed ARN, None if the resource type is not supported"""
+    resource_type = resource.split("/", 1)[0].split(":", 1)[0]
+    return DISPATCH.get(f"{service}:{resource_type}") or DISPATCH.get(f"{service}:*")
+
+
+def _parse_resources(arns):
+    """Yield (action, arn, service, resource) for every ARN, skipping unsupported resources"""
+    for arn in arns:
+        service, resource = parse_arn(arn)
+        action = get_delete_action(service, resource)
+        if action is None:
+            print(f"Skipping unsupported resource: {arn}")
+            continue
+        yield action, arn, service, resource
+
+
+def _group_by_action(arns):
+    """Group parsed ARNs by their delete function"""
+    resources_by_action = {}
+    for action, arn, service, resource in _parse_resources(arns):
+        resources_by_action.setdefault(action, []).append((arn, service, resource))
+    return resources_by_action
+
+
+def print_delete_plan(arns):
+    """Print which delete function handles each resource and in which wave, without deleting"""
+    resources_by_action = _group_by_action(arns)
+    for i, wave in enumerate(DELETE_WAVES, 1):
+        print(f"Wave {i}:")
+        for action in wave:
+            for arn, service, resource in resources_by_action.get(action, []):
+                print(f"-> {action.__name__}: {arn}")
+
+
+def delete_resources(arns, dry_run=False):
+    """Delete all resources by ARN using appropriate deletion methods
+
+    arns can be any iterable such as iter_tagged_resources(...), resources of the first wave are
+    then deleted while the remaining ARNs are still being listed. With dry_run only the delete
+    plan is printed.
+    """
+    if dry_run:
+        print_delete_plan(arns)
+        return
+    # Drop cached lookups up front, so a re-run lists the live resources even if this run fails
+    clear_cache()
+
+    first_wave = set(DELETE_WAVES[0])
+    resources_by_action = {}
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = []
+        for action, arn, service, resource in _parse_resources(arns):
+            if action in first_wave:
+                futures.append(executor.submit(action, arn, service, resource))
+            else:
+                resources_by_action.setdefault(action, []).append((arn, service, resource))
+
+        for i, wave in enumerate(DELETE_WAVES):
+            if i > 0:
+                futures = [
+                    executor.submit(action, arn, service, resource)
+                    for action in wave
+                    for arn, service, resource in resources_by_action.get(action, [])
+                ]
+            # Barrier, the next wave starts when this one is done
+            wait(futures)
+            for future in futures:
+                future.result()
+
+
+async def delete_resources_async(arns, max_concurrency=32, dry_run=False):
+    """Delete all resources by ARN from a running event loop, e.g. `await delete_resources_async(arns)`"""
+    if dry_run:
+        print_delete_plan(arns)
+        return
+    # Drop cached lookups up front, so a re-run lists the live resources even if this run fails
+    clear_cache()
+
+    resources_by_action = _group_by_action(arns)
+    loop = asyncio.get_running_loop()
+
+    # Own executor with max_concurrency threads, the loop's default executor is capped by the CPU count
+    executor = ThreadPoolExecutor(max_workers=max_concurrency)
+    try:
+        for wave in DELETE_WAVES:
+            await asyncio.gather(*(
+                loop.run_in_executor(executor, action, arn, service, resource)
+                for action in wave
+                for arn, service, resource in resources_by_action.get(action, [])
+            ))
+    finally:
+        # Never block the event loop on shutdown, after an error or cancellation the queued
+        # deletions are dropped and the running ones finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Delete all resources with the given tag")
+    parser.add_argument("name", help="tag name, e.g. app")
+    parser.add_argument("value", help="tag value, e.g. pace_bootcamp")
+    parser.add_argument("--dry-run", action="store_true", help="only print what would be deleted")
+    parser.add_argument("--cache-ttl", type=int, default=None,
+                        help="reuse the tag lookup of a previous run for this many seconds")
+    parser.add_argument("--scan-iam-roles", action="store_true", help="also check the tags of every IAM role")
+    args = parser.parse_args()
+
+    resources = get_tagged_resources(args.name, args.value, args.scan_iam_roles, cache_ttl=args.cache_ttl)
+    delete_resources(resources, dry_run=args.dry_run)
@@ -1,11 +1,10 @@
 import os
 import io
 import base64
-import matplotlib.pyplot as plt
-from PIL import Image
-import numpy as np
+from IPython.display import Image as IPythonImage, display
+from PIL import Image, ImageDraw, ImageOps
 
-def save_image(image_data, filename, output_dir="output"):
+def save_image(image_data, filename, output_dir="output", convert_to=None):
     """
     Save a base64 encoded image to a file
     
@@ -13,6 +12,8 @@ def save_image(image_data, filename, output_dir="output"):
         image_data (str): Base64 encoded image data
         filename (str): Filename to save the image as
         output_dir (str): Directory to save the image in
+        convert_to (str): Optional image format (e.g. "JPEG") to re-encode the image to,
+            by default the encoded bytes are written as they are
     
     Returns:
         str: Path to the saved image
@@ -23,20 +24,81 @@ def save_image(image_data, filename, output_dir="output"):
     # Decode the base64 image data
     image_bytes = base64.b64decode(image_data)
     
-    # Create a PIL Image from the bytes
-    image = Image.open(io.BytesIO(image_bytes))
-    
     # Create the full path
     path = os.path.join(output_dir, filename)
     
-    # Save the image
-    image.save(path)
+    if convert_to:
+        # Re-encode through PIL only when a different format is requested
+        image = Image.open(io.BytesIO(image_bytes))
+        image.save(path, format=convert_to)
+    else:
+        # The data already is an encoded PNG/JPEG, write it without decoding the pixels
+        with open(path, "wb") as f:
+            f.write(image_bytes)
     
     return path
 
-def plot_images(images, titles=None, figsize=(15, 15), columns=3):
+def _image_grid(images, titles, figsize, columns, dpi):
+    """
+    Paste images into a single grid canvas
+    
+    Returns:
+        tuple: (canvas PIL Image, tile width, tile height, title band height)
     """
-    Plot multiple images in a grid
+    # Calculate number of rows needed
+    rows = (len(images) + columns - 1) // columns
+    
+    # Size each tile so the whole grid matches the figure resolution
+    tile_w = int(figsize[0] * dpi // columns)
+    tile_h = int(figsize[1] * dpi // rows)
+    # Reserve a band above each image for its title
+    title_h = 24 if titles else 0
+    
+    canvas = Image.new("RGB", (columns * tile_w, rows * tile_h), "white")
+    for i, image in enumerate(images):
+        # Load image if it's a path, letting JPEGs decode at a reduced scale close to the tile size
+        if isinstance(image, str):
+            image = Image.open(image)
+            image.draft("RGB", (tile_w, tile_h - title_h))
+            image.load()
+        
+        # Scale to fit the tile, keeping the aspect ratio, and center it
+        tile = ImageOps.contain(image.convert("RGB"), (tile_w, tile_h - title_h), Image.BILINEAR)
+        r, c = divmod(i, columns)
+        top = r * tile_h + title_h + (tile_h - title_h - tile.height) // 2
+        left = c * tile_w + (tile_w - tile.width) // 2
+        canvas.paste(tile, (left, top))
+    
+    return canvas, tile_w, tile_h, title_h
+
+def plot_images(images, titles=None, figsize=(15, 15), columns=3, dpi=100):
+    """
+    Plot multiple images in a grid, rendered as a single PNG in the notebook
+    
+    Args:
+        images (list): List of PIL Images or paths to images
+        titles (list): Optional list of titles for each image
+        figsize (tuple): Figure size in inches (width, height)
+        columns (int): Number of columns in the grid
+        dpi (int): Pixels per inch of the rendered grid
+    """
+    canvas, tile_w, tile_h, title_h = _image_grid(images, titles, figsize, columns, dpi)
+    
+    # Set titles if provided, centered above each tile
+    if titles:
+        draw = ImageDraw.Draw(canvas)
+        for i, title in enumerate(titles[:len(images)]):
+            r, c = divmod(i, columns)
+            x = c * tile_w + (tile_w - draw.textlength(title)) / 2
+            draw.text((x, r * tile_h + title_h / 4), title, fill="black")
+    
+    buffer = io.BytesIO()
+    canvas.save(buffer, "PNG")
+    display(IPythonImage(data=buffer.getvalue()))
+
+def plot_images_mpl(images, titles=None, figsize=(15, 15), columns=3):
+    """
+    Plot multiple images in a grid with matplotlib
     
     Args:
         images (list): List of PIL Images or paths to images
@@ -44,39 +106,22 @@ def plot_images(images, titles=None, figsize=(15, 15), columns=3):
         figsize (tuple): Figure size (width, height)
         columns (int): Number of columns in the grid
     """
-    # Calculate number of rows needed
-    rows = (len(images) + columns - 1) // columns
+    # matplotlib is slow to import, only load it when this variant is used
+    import matplotlib.pyplot as plt
     
-    # Create figure and axes
-    fig, axes = plt.subplots(rows, columns, figsize=figsize)
+    dpi = plt.rcParams['figure.dpi']
+    canvas, tile_w, tile_h, _ = _image_grid(images, None, figsize, columns, dpi)
     
-    # Flatten axes if there are multiple rows
-    if rows > 1:
-        axes = axes.flatten()
-    elif rows == 1 and columns == 1:
-        axes = [axes]
+    # Draw the whole grid with a single imshow call
+    plt.figure(figsize=figsize)
+    plt.imshow(canvas)
+    plt.axis('off')
     
-    # Plot each image
-    for i, image in enumerate(images):
-        if i < len(axes):
-            # Load image if it's a path
-            if isinstance(image, str):
-                image = Image.open(image)
-            
-            # Display image
-            axes[i].imshow(np.array(image))
-            
-            # Set title if provided
-            if titles and i < len(titles):
-                axes[i].set_title(titles[i])
-            
-            # Remove axis ticks
-            axes[i].set_xticks([])
-            axes[i].set_yticks([])
-    
-    # Hide unused axes
-    for i in range(len(images), len(axes)):
-        axes[i].axis('off')
+    # Set titles if provided, centered above each tile
+    if titles:
+        for i, title in enumerate(titles[:len(images)]):
+            r, c = divmod(i, columns)
+            plt.text(c * tile_w + tile_w / 2, r * tile_h, title, ha='center', va='bottom')
     
     plt.tight_layout()
     plt.show()
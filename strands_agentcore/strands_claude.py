@@ -4,7 +4,7 @@ import argparse
 import json
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
 from strands.models import BedrockModel
-from retrying import retry
+from botocore.config import Config
 
 app = BedrockAgentCoreApp()
 
@@ -16,8 +16,11 @@ def weather():
 
 
 model_id = "us.anthropic.claude-sonnet-4-20250514-v1:0"
+# Adaptive retry mode makes botocore back off on throttling (all AWS throttling error codes)
+# with a per endpoint token bucket, so the agent call needs no retry wrapper
 model = BedrockModel(
     model_id=model_id,
+    boto_client_config=Config(retries={"mode": "adaptive", "max_attempts": 10}),
 )
 agent = Agent(
     model=model,
@@ -26,12 +29,9 @@ agent = Agent(
     callback_handler=None,  # default is PrintingCallbackHandler
 )
 
-# Retry if the agent throws a throttling exception.
+# Throttling is retried by botocore, see the model config above.
 # You could also return a response to the client and let it handle the retriable HTTP codes
 # using https://docs.aws.amazon.com/bedrock-agentcore/latest/APIReference/API_InvokeAgentRuntime.html#API_InvokeAgentRuntime_ResponseSyntax
-@retry(retry_on_exception=lambda e: ('throttl' in str(e)),
-       wait_fixed=5000,
-       stop_max_delay=30*1000)
 def call_agent(user_input):
     return agent(user_input)
 
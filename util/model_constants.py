@@ -2,6 +2,8 @@
 Amazon Bedrock Model Constants with Metadata
 Contains all model IDs and metadata used across the workshop notebooks
 """
+from types import MappingProxyType
+
 
 MODELS = {
     "us.amazon.nova-lite-v1:0": {
@@ -60,11 +62,11 @@ MODELS = {
     }
 }
 
-# Filtered lists for different use cases
-TEXT_MODELS = {k: v for k, v in MODELS.items() if v["type"] == "text"}
-EMBEDDING_MODELS = {k: v for k, v in MODELS.items() if v["type"] == "embeddings"}
-IMAGE_MODELS = {k: v for k, v in MODELS.items() if v["type"] == "image"}
-VIDEO_MODELS = {k: v for k, v in MODELS.items() if v["type"] == "video"}
+# Filtered lists for different use cases (read-only views)
+TEXT_MODELS = MappingProxyType({k: v for k, v in MODELS.items() if v["type"] == "text"})
+EMBEDDING_MODELS = MappingProxyType({k: v for k, v in MODELS.items() if v["type"] == "embeddings"})
+IMAGE_MODELS = MappingProxyType({k: v for k, v in MODELS.items() if v["type"] == "image"})
+VIDEO_MODELS = MappingProxyType({k: v for k, v in MODELS.items() if v["type"] == "video"})
 
 # Default models for different scenarios
 DEFAULT_TEXT_MODEL = "us.amazon.nova-lite-v1:0"
@@ -3,11 +3,25 @@ Interactive Model Selection Widget for Jupyter Notebooks
 Provides unified model selection and Bedrock API interface
 """
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
 import ipywidgets as widgets
 from IPython.display import display
 from .model_constants import (EMBEDDING_MODELS, IMAGE_MODELS, MODELS,
                              TEXT_MODELS, VIDEO_MODELS)
 
+# Models and dropdown options per model type, built once at import
+_MODELS_BY_TYPE = {
+    "text": TEXT_MODELS,
+    "embeddings": EMBEDDING_MODELS,
+    "image": IMAGE_MODELS,
+    "video": VIDEO_MODELS,
+}
+_OPTIONS_BY_TYPE = {
+    model_type: tuple((f"{v['name']} - {v['description']}", k) for k, v in models.items())
+    for model_type, models in [*_MODELS_BY_TYPE.items(), (None, MODELS)]
+}
+
 
 class ModelSelector:
     def __init__(self, model_type="text", default_model=None, show_description=True):
@@ -15,21 +29,12 @@ class ModelSelector:
         self.selected_model = None
         self.show_description = show_description
         
-        # Get appropriate models based on type
-        if model_type == "text":
-            available_models = TEXT_MODELS
-        elif model_type == "embeddings":
-            available_models = EMBEDDING_MODELS
-        elif model_type == "image":
-            available_models = IMAGE_MODELS
-        elif model_type == "video":
-            available_models = VIDEO_MODELS
-        else:
-            available_models = MODELS
+        # Get appropriate models based on type, all models for an unknown type
+        type_key = model_type if model_type in _MODELS_BY_TYPE else None
+        available_models = _MODELS_BY_TYPE.get(type_key, MODELS)
             
         # Create dropdown options
-        options = [(f"{v['name']} - {v['description']}", k) 
-                  for k, v in available_models.items()]
+        options = _OPTIONS_BY_TYPE[type_key]
         
         # Set default model
         if default_model and default_model in available_models:
@@ -94,10 +99,24 @@ class BedrockConverse:
     Unified Bedrock API wrapper using Converse API
     Works with all text models (Nova, Claude, Titan, etc.)
     """
-    def __init__(self, region_name=None):
-        self.client = boto3.client('bedrock-runtime', region_name=region_name)
+    DEFAULT_MAX_TOKENS = 1000
+    DEFAULT_TEMPERATURE = 0.3
+    DEFAULT_TOP_P = 0.9
+    THROTTLING_ERROR_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceUnavailableException"}
+
+    def __init__(self, region_name=None, config=None):
+        # Adaptive retries let botocore back off on throttling, no retry loop needed here
+        if config is None:
+            config = Config(retries={"mode": "adaptive", "max_attempts": 10}, max_pool_connections=32)
+        self.client = boto3.client('bedrock-runtime', region_name=region_name, config=config)
+        self._default_cfg = {
+            'maxTokens': self.DEFAULT_MAX_TOKENS,
+            'temperature': self.DEFAULT_TEMPERATURE,
+            'topP': self.DEFAULT_TOP_P
+        }
     
-    def converse(self, model_id, messages, max_tokens=1000, temperature=0.3, top_p=0.9, top_k=None):
+    def converse(self, model_id, messages, max_tokens=DEFAULT_MAX_TOKENS, temperature=DEFAULT_TEMPERATURE,
+                 top_p=DEFAULT_TOP_P, top_k=None):
         """
         Unified converse method using Converse API
         
@@ -110,10 +129,13 @@ class BedrockConverse:
             top_k (int): Top-k sampling parameter (optional)
         
         Returns:
-            str: Generated text response
+            str: Generated text response, None if the request was still throttled after retrying
         """
-        try:
-            # Build inference config
+        # Reuse the default inference config unless the caller customizes it
+        if (max_tokens, temperature, top_p, top_k) == (
+                self.DEFAULT_MAX_TOKENS, self.DEFAULT_TEMPERATURE, self.DEFAULT_TOP_P, None):
+            inference_config = self._default_cfg
+        else:
             inference_config = {
                 'maxTokens': max_tokens,
                 'temperature': temperature,
@@ -123,7 +145,8 @@ class BedrockConverse:
             # Add top_k if specified (not all models support it)
             if top_k is not None:
                 inference_config['topK'] = top_k
-            
+        
+        try:
             response = self.client.converse(
                 modelId=model_id,
                 messages=messages,
@@ -132,7 +155,9 @@ class BedrockConverse:
             
             return response['output']['message']['content'][0]['text']
             
-        except Exception as e:
+        except ClientError as e:
+            if e.response['Error']['Code'] not in self.THROTTLING_ERROR_CODES:
+                raise
             print(f"Error invoking model {model_id}: {str(e)}")
             return None
 